@@ -26,14 +26,17 @@ Environment (example):
 """
 
 import argparse
+import codecs
+import functools
 import os
+import queue
 import re
 import struct
 import sys
 import threading
 import time
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 import memory_ipc
@@ -78,6 +81,46 @@ CHARACTER_MAP = {
 }
 REVERSE_CHARACTER_MAP = {v: k for k, v in CHARACTER_MAP.items()}
 
+# Flat byte -> char table so the decoder indexes a list instead of hashing per byte
+CHAR_TABLE = [f"[?{i:02X}]" for i in range(256)]
+for _byte, _char in CHARACTER_MAP.items():
+    CHAR_TABLE[_byte] = _char
+
+# Reverse of the above for code points < 256: REVERSE_ASCII[ord(ch)] is the
+# output byte when REVERSE_ASCII_VALID[ord(ch)] is set, so whole words can be
+# encoded with one bytes.translate call
+_reverse_ascii = bytearray(256)
+_reverse_ascii_valid = bytearray(256)
+for _char, _byte in REVERSE_CHARACTER_MAP.items():
+    if len(_char) == 1 and ord(_char) < 256:
+        _reverse_ascii[ord(_char)] = _byte
+        _reverse_ascii_valid[ord(_char)] = 1
+REVERSE_ASCII = bytes(_reverse_ascii)
+REVERSE_ASCII_VALID = bytes(_reverse_ascii_valid)
+_REVERSE_ASCII_CHARS = frozenset(chr(i) for i in range(256) if REVERSE_ASCII_VALID[i])
+
+# bytes.translate table for plain-text runs: every byte whose char is a single
+# Latin-1 codepoint maps to that codepoint; 0x00 marks bytes needing CHAR_TABLE
+LATIN1_TABLE = bytes(
+    ord(c) if len(c) == 1 and ord(c) < 256 else 0x00 for c in CHAR_TABLE
+)
+
+# "ac-gc" codec so plain runs holding emoji/multi-codepoint chars still decode
+# in one C call (charmap_decode indexes CHAR_TABLE, which allows multi-char entries)
+AC_GC_CODEC = "ac-gc"
+_AC_GC_ENCODING_MAP = {ord(ch): byte for ch, byte in REVERSE_CHARACTER_MAP.items() if len(ch) == 1}
+
+def _ac_gc_search(name: str) -> Optional[codecs.CodecInfo]:
+    if name.replace("_", "-") != AC_GC_CODEC:
+        return None
+    return codecs.CodecInfo(
+        name=AC_GC_CODEC,
+        encode=lambda text, errors="strict": codecs.charmap_encode(text, errors, _AC_GC_ENCODING_MAP),
+        decode=lambda data, errors="strict": codecs.charmap_decode(data, errors, CHAR_TABLE),
+    )
+
+codecs.register(_ac_gc_search)
+
 # 2. Control Codes Maps
 CONTROL_CODES = {
     0x00: "<End Conversation>", 0x01: "<Continue>", 0x02: "<Clear Text>", 0x03: "<Pause [{:02X}]>", 0x04: "<Press A>",
@@ -118,19 +161,16 @@ def _strip_control_codes(text: str) -> str:
 def _inject_feeling_chatty_option(text: str) -> Optional[str]:
     def _replacement(match: re.Match) -> str:
         between = match.group(2)
-        leading_ws_match = re.match(r"^\s*", between)
-        trailing_ws_match = re.search(r"\s*$", between)
-        leading_ws = leading_ws_match.group(0) if leading_ws_match else ""
-        trailing_ws = trailing_ws_match.group(0) if trailing_ws_match else ""
+        leading_ws = between[:len(between) - len(between.lstrip())]
+        trailing_ws = between[len(between.rstrip()):]
         return (
             f"{match.group(1)}"
             f"{leading_ws}{FEELING_CHATTY_LABEL}{trailing_ws}"
             f"{match.group(3)}"
         )
 
-    if not _CHOICE_ONE_PATTERN.search(text):
-        return None
-    return _CHOICE_ONE_PATTERN.sub(_replacement, text, count=1)
+    new_text, count = _CHOICE_ONE_PATTERN.subn(_replacement, text, count=1)
+    return new_text if count else None
 
 
 @dataclass
@@ -191,6 +231,9 @@ CODE_ARG_COUNT = {
     0x03: 1, 0x05: 3, 0x08: 3, 0x09: 3, 0x0A: 3, 0x0B: 3, 0x0C: 3, 0x0E: 2, 0x0F: 2, 0x10: 2, 0x11: 2, 0x12: 2,
     0x13: 4, 0x14: 6, 0x15: 8, 0x16: 4, 0x17: 6, 0x18: 8, 0x50: 4, 0x53: 1, 0x54: 2, 0x56: 2, 0x57: 2, 0x59: 1, 0x5A: 2,
 }
+CODE_ARG_COUNT_TABLE = [0] * 256
+for _code, _count in CODE_ARG_COUNT.items():
+    CODE_ARG_COUNT_TABLE[_code] = _count
 
 EXPRESSION_MAP = {
     0x00: "None?", 0x01: "Glare", 0x02: "Shocked", 0x03: "Laugh", 0x04: "Surprised",
@@ -223,188 +266,331 @@ PLAYER_EMOTIONS = {0x02: "Surprised", 0xFD: "Purple Mist", 0xFE: "Scared", 0xFF:
 
 # --- Helpers: normalization/sanitization -------------------------------------
 
+# Closing tags are stripped in their own pass first: removing one can splice a
+# new opening tag together (e.g. "<</b>Pause 5>"), which the fused pass must see.
+_NORM_CLOSING_TAG = re.compile(r"</[^>]+>")
+# Every loose tag spelling, fused into one alternation; the outermost named group
+# of each branch is what m.lastgroup reports, and selects the formatter below.
+# The shared "<" stays outside the alternation so the engine can skip ahead to it.
+_NORM_TAG_RE = re.compile(
+    r"<(?:"
+    r"(?P<npc_expr>NPC\s+Expression\s+\[?(?:Cat:)?(?P<npc_cat>[0-9A-Fa-f]{1,2})\]?\s+\[?(?P<npc_val>[0-9A-Fa-f]{1,4})\]?>)"
+    r"|(?P<player_emotion>Player\s+Emotion\s+\[?(?P<emo_a>[0-9A-Fa-f]{1,2})\]?\s+\[?(?P<emo_b>[0-9A-Fa-f]{1,4})\]?>)"
+    r"|(?P<pause>Pause\s+(?P<pause_val>[0-9A-Fa-f]{1,2})>)"
+    r"|(?P<line_type>Line Type\s+(?P<line_type_val>[0-9A-Fa-f]{1,2})>)"
+    r"|(?P<sound_effect>Play Sound Effect\s+(?P<sound_val>[0-9A-Fa-f]{1,2})>)"
+    r"|(?P<char_size>Char Size\s+(?P<char_size_val>[0-9A-Fa-f]{1,4})>)"
+    r"|(?P<line_size>Line Size\s+(?P<line_size_val>[0-9A-Fa-f]{1,4})>)"
+    r"|(?P<color_for>Color\s+\[?(?P<for_rgb>[0-9A-Fa-f]{6})\]?\s+for\s+\[?(?P<for_len>[0-9A-Fa-f]{1,2})\]?(?:\s+chars?)?>)"
+    r"|(?P<color_line>Color\s+Line\s+\[?(?P<line_rgb>[0-9A-Fa-f]{6})\]?>)"
+    r"|(?P<color_bare>Color\s+(?P<bare_rgb>[0-9A-Fa-f]{6})>)"
+    r"|(?P<color_bracketed>Color\s+\[(?P<bracketed_rgb>[0-9A-Fa-f]{6})\]>)"
+    r")"
+)
+_NORM_TAG_FORMATTERS = {
+    "npc_expr": lambda m: f"<NPC Expression [{m['npc_cat'].upper().zfill(2)}] [{m['npc_val'].upper().zfill(4)}]>",
+    "player_emotion": lambda m: f"<Player Emotion [{m['emo_a'].upper().zfill(2)}] [{m['emo_b'].upper().zfill(4)}]>",
+    "pause": lambda m: f"<Pause [{m['pause_val'].upper().zfill(2)}]>",
+    "line_type": lambda m: f"<Line Type [{m['line_type_val'].upper().zfill(2)}]>",
+    "sound_effect": lambda m: f"<Play Sound Effect [{m['sound_val'].upper().zfill(2)}]>",
+    "char_size": lambda m: f"<Char Size [{m['char_size_val'].upper().zfill(4)}]>",
+    "line_size": lambda m: f"<Line Size [{m['line_size_val'].upper().zfill(4)}]>",
+    "color_for": lambda m: f"<Color [{m['for_rgb'].upper()}] for [{m['for_len'].upper().zfill(2)}] chars>",
+    "color_line": lambda m: f"<Color Line [{m['line_rgb'].upper()}]>",
+    "color_bare": lambda m: f"<Color Line [{m['bare_rgb'].upper()}]>",
+    "color_bracketed": lambda m: f"<Color Line [{m['bracketed_rgb'].upper()}]>",
+}
+
 def _normalize_control_tags(text: str) -> str:
-    def two_hex(m): return f"{m.group(1)} [{m.group(2).upper().zfill(2)}]>"
-    def four_hex(m): return f"{m.group(1)} [{m.group(2).upper().zfill(4)}]>"
-    text = re.sub(r"</[^>]+>", "", text)
-    text = re.sub(
-        r"<NPC\s+Expression\s+\[?(?:Cat:)?([0-9A-Fa-f]{1,2})\]?\s+\[?([0-9A-Fa-f]{1,4})\]?>",
-        lambda m: f"<NPC Expression [{m.group(1).upper().zfill(2)}] [{m.group(2).upper().zfill(4)}]>", text
-    )
-    text = re.sub(
-        r"<Player\s+Emotion\s+\[?([0-9A-Fa-f]{1,2})\]?\s+\[?([0-9A-Fa-f]{1,4})\]?>",
-        lambda m: f"<Player Emotion [{m.group(1).upper().zfill(2)}] [{m.group(2).upper().zfill(4)}]>", text
-    )
-    text = re.sub(r"<(Pause)\s+([0-9A-Fa-f]{1,2})>", lambda m: f"<Pause [{m.group(2).upper().zfill(2)}]>", text)
-    text = re.sub(r"<(Line Type)\s+([0-9A-Fa-f]{1,2})>", lambda m: f"<Line Type [{m.group(2).upper().zfill(2)}]>", text)
-    text = re.sub(r"<(Play Sound Effect)\s+([0-9A-Fa-f]{1,2})>", lambda m: f"<Play Sound Effect [{m.group(2).upper().zfill(2)}]>", text)
-    text = re.sub(r"<(Char Size)\s+([0-9A-Fa-f]{1,4})>", lambda m: f"<Char Size [{m.group(2).upper().zfill(4)}]>", text)
-    text = re.sub(r"<(Line Size)\s+([0-9A-Fa-f]{1,4})>", lambda m: f"<Line Size [{m.group(2).upper().zfill(4)}]>", text)
-    text = re.sub(
-        r"<Color\s+\[?([0-9A-Fa-f]{6})\]?\s+for\s+\[?([0-9A-Fa-f]{1,2})\]?>",
-        lambda m: f"<Color [{m.group(1).upper()}] for [{m.group(2).upper().zfill(2)}] chars>", text
-    )
-    text = re.sub(
-        r"<Color\s+\[?([0-9A-Fa-f]{6})\]?\s+for\s+\[?([0-9A-Fa-f]{1,2})\]?\s+chars?>",
-        lambda m: f"<Color [{m.group(1).upper()}] for [{m.group(2).upper().zfill(2)}] chars>", text
-    )
-    text = re.sub(r"<Color\s+Line\s+\[?([0-9A-Fa-f]{6})\]?>",
-                  lambda m: f"<Color Line [{m.group(1).upper()}]>", text)
-    text = re.sub(r"<Color\s+([0-9A-Fa-f]{6})>", lambda m: f"<Color Line [{m.group(1).upper()}]>", text)
-    text = re.sub(r"<Color\s+\[([0-9A-Fa-f]{6})\]>", lambda m: f"<Color Line [{m.group(1).upper()}]>", text)
-    return text
+    text = _NORM_CLOSING_TAG.sub("", text)
+    return _NORM_TAG_RE.sub(lambda m: _NORM_TAG_FORMATTERS[m.lastgroup](m), text)
+
+_VISIBLE_TEXT_REPLACEMENTS = (
+    ("\u2019", "'"), ("\u2018", "'"), ("\u201C", '"'), ("\u201D", '"'),
+    ("\u2014", "-"), ("\u2013", "-"), ("\u2026", "..."), ("\u00A0", " "),
+)
 
 def _normalize_visible_text(text: str) -> str:
-    replacements = {
-        "\u2019": "'", "\u2018": "'", "\u201C": '"', "\u201D": '"',
-        "\u2014": "-", "\u2013": "-", "\u2026": "...", "\u00A0": " ",
-    }
-    for src, dst in replacements.items():
+    # every source char is non-ASCII; str.replace is a memchr miss when absent,
+    # which beats str.translate's per-char dict lookup on mixed text
+    if text.isascii():
+        return text
+    for src, dst in _VISIBLE_TEXT_REPLACEMENTS:
         text = text.replace(src, dst)
     return text
 
+class _SanitizeTable(dict):
+    """str.translate table: encodable code points map to themselves, anything else is dropped."""
+
+    def __missing__(self, codepoint: int) -> None:
+        return None
+
+_SANITIZE_TABLE = _SanitizeTable({ord(ch): ord(ch) for ch in REVERSE_CHARACTER_MAP if len(ch) == 1})
+_SANITIZE_TABLE.update({cp: cp for cp in range(32, 127)})
+_SANITIZE_TABLE[ord("\n")] = ord("\n")
+
 def _sanitize_for_charset(text: str) -> str:
     """
     Remove or replace characters not present in REVERSE_CHARACTER_MAP.
     Keeps newlines, basic punctuation, and ASCII; drops stray emoji.
     """
-    out = []
-    for ch in text:
-        if ch == "\n" or ch in REVERSE_CHARACTER_MAP:
-            out.append(ch)
-            continue
-        # ascii safe?
-        if 32 <= ord(ch) < 127:
-            out.append(ch)
-            continue
-        # otherwise drop
-        # (you could also map 🌼->* etc if you want)
-    return "".join(out)
+    # (you could also map 🌼->* etc in _SANITIZE_TABLE if you want)
+    return text.translate(_SANITIZE_TABLE)
 
 # --- Parsing/encoding ---------------------------------------------------------
 
+_TAG_RE = re.compile(r'<[^>]+>')
+_TAG_ARG_RE = re.compile(r'\[[^\]]*?([0-9a-fA-F]{1,6})\]')
+_TAG_ARG_SLOT_RE = re.compile(r'\[.*?\]')
+
+# Normalization and sanitization never add or remove "<" / ">", so tag
+# boundaries are the same before and after them: split once, then clean each
+# token in place rather than rewriting the whole string three times over.
+@functools.lru_cache(maxsize=256)
+def _clean_tag_token(token: str) -> str:
+    token = _NORM_TAG_RE.sub(lambda m: _NORM_TAG_FORMATTERS[m.lastgroup](m), token)
+    return _sanitize_for_charset(_normalize_visible_text(token))
+
+def _iter_encode_tokens(text: str):
+    """Yield normalized, sanitized text runs and <...> tags in encode order."""
+    if "</" in text:
+        text = _NORM_CLOSING_TAG.sub("", text)
+    pending = ""
+    pos = 0
+    # stream the tags and slice the text between them; no split() list
+    for m in _TAG_RE.finditer(text):
+        start = m.start()
+        if start > pos:
+            pending += _sanitize_for_charset(_normalize_visible_text(text[pos:start]))
+        pos = m.end()
+        token = _clean_tag_token(m.group())
+        if token == "<>":
+            # sanitized down to "<>": no longer a tag, so it joins the text run
+            pending += token
+            continue
+        if pending:
+            yield pending
+            pending = ""
+        yield token
+    if pos < len(text):
+        pending += _sanitize_for_charset(_normalize_visible_text(text[pos:]))
+    if pending:
+        yield pending
+
+# The watch loop re-parses the same dialogue buffer on most ticks and
+# round-trips injected text through encode -> parse, so both sides are memoized.
+# The tables they read are fixed at import time, so the caches never go stale.
+_CODEC_CACHE_SIZE = 512
+
+# Per-command argument handlers, looked up once per control code instead of
+# walking an if-ladder. Decoders turn the raw argument bytes into the values
+# CONTROL_CODES[command].format() expects; packers do the reverse for encode.
+
+def _decode_expression_args(args_bytes: bytes) -> tuple:
+    val = struct.unpack('>H', args_bytes[1:3])[0]
+    return args_bytes[0], EXPRESSION_MAP.get(val, f"Unknown_{val:04X}")
+
+def _decode_emotion_args(args_bytes: bytes) -> tuple:
+    val = struct.unpack('>H', args_bytes[1:3])[0]
+    return args_bytes[0], PLAYER_EMOTIONS.get(val, f"Unknown_Emotion_{val:04X}")
+
+def _decode_music_args(args_bytes: bytes) -> tuple:
+    music_id, transition_type = args_bytes[0], args_bytes[1]
+    return (
+        MUSIC_LIST.get(music_id, f"Unknown_Music_{music_id:02X}"),
+        MUSIC_TRANSITIONS.get(transition_type, f"Unknown_Transition_{transition_type:02X}"),
+    )
+
+def _decode_sound_args(args_bytes: bytes) -> tuple:
+    sound_id = args_bytes[0]
+    return (SOUNDEFFECT_LIST.get(sound_id, f"Unknown_Sound_{sound_id:02X}"),)
+
+def _decode_u16_list_args(args_bytes: bytes) -> tuple:
+    return struct.unpack(f'>{len(args_bytes) // 2}H', args_bytes)
+
+_ARG_DECODERS_BY_COUNT = {
+    1: lambda args_bytes: (args_bytes[0],),
+    2: lambda args_bytes: struct.unpack('>H', args_bytes),
+    3: tuple,
+}
+_ARG_DECODERS = {
+    code: _ARG_DECODERS_BY_COUNT.get(count, _decode_u16_list_args) for code, count in CODE_ARG_COUNT.items()
+}
+_ARG_DECODERS.update({
+    0x05: lambda args_bytes: (int.from_bytes(args_bytes, 'big'),),
+    0x08: _decode_emotion_args,
+    0x09: _decode_expression_args,
+    0x50: lambda args_bytes: (int.from_bytes(args_bytes[0:3], 'big'), args_bytes[3]),
+    0x56: _decode_music_args,
+    0x57: _decode_music_args,
+    0x59: _decode_sound_args,
+})
+
+def _pack_u16_list_args(args) -> bytes:
+    return b"".join(struct.pack('>H', arg) for arg in args)
+
+_ARG_PACKERS_BY_COUNT = {
+    1: lambda args: struct.pack('>B', args[0]),
+    2: lambda args: struct.pack('>H', args[0]),
+}
+_ARG_PACKERS = {
+    code: _ARG_PACKERS_BY_COUNT.get(count, _pack_u16_list_args) for code, count in CODE_ARG_COUNT.items()
+}
+_ARG_PACKERS.update({
+    0x05: lambda args: args[0].to_bytes(3, 'big'),
+    0x08: lambda args: struct.pack('>B', args[0]) + struct.pack('>H', args[1]),
+    0x09: lambda args: struct.pack('>B', args[0]) + struct.pack('>H', args[1]),
+    0x50: lambda args: args[0].to_bytes(3, 'big') + struct.pack('>B', args[1]),
+})
+
+def _format_control_code(command: int, args_bytes: bytes) -> str:
+    """Render one control code (command byte + its complete argument bytes) as a tag."""
+    desc = CONTROL_CODES.get(command, f"<Code 0x{command:02X}>")
+    decoder = _ARG_DECODERS.get(command)
+    if decoder is None:
+        return desc
+    try:
+        return desc.format(*decoder(args_bytes))
+    except (TypeError, IndexError):
+        return desc
+
 def parse_ac_text(data: bytes) -> str:
+    return _parse_ac_text_cached(bytes(data))
+
+@functools.lru_cache(maxsize=_CODEC_CACHE_SIZE)
+def _parse_ac_text_cached(data: bytes) -> str:
     text_buffer = []
+    n = len(data)
+    # next 0x7F / 0x00 positions, re-scanned only once i has moved past them
+    next_prefix = -1
+    next_zero = -1
     i = 0
-    while i < len(data):
+    while i < n:
         byte = data[i]
         if byte == 0x00:
             break
         if byte == PREFIX_BYTE:
             i += 1
-            if i >= len(data): break
+            if i >= n: break
             command = data[i]
             if command == 0x00:
                 text_buffer.append(CONTROL_CODES[command])
                 break
-            desc = CONTROL_CODES.get(command, f"<Code 0x{command:02X}>")
-            num_args = CODE_ARG_COUNT.get(command, 0)
-            if num_args > 0:
-                args_bytes = data[i+1 : i+1+num_args]
-                args_tuple = []
-                if len(args_bytes) < num_args:
-                    text_buffer.append(f"<Malformed Code 0x{command:02X}>")
-                    i += 1 + len(args_bytes)
-                    continue
-                if command in [0x08, 0x09]:  # 1B + 2B
-                    first_arg = args_bytes[0]
-                    val = struct.unpack('>H', args_bytes[1:3])[0]
-                    if command == 0x09:
-                        name = EXPRESSION_MAP.get(val, f"Unknown_{val:04X}")
-                    else:
-                        name = PLAYER_EMOTIONS.get(val, f"Unknown_Emotion_{val:04X}")
-                    args_tuple.extend([first_arg, name])
-                elif command in [0x56, 0x57]:  # 1B + 1B
-                    music_id = args_bytes[0]
-                    transition_type = args_bytes[1]
-                    music_name = MUSIC_LIST.get(music_id, f"Unknown_Music_{music_id:02X}")
-                    transition_name = MUSIC_TRANSITIONS.get(transition_type, f"Unknown_Transition_{transition_type:02X}")
-                    args_tuple.extend([music_name, transition_name])
-                elif num_args == 1:
-                    if command == 0x59:
-                        sound_id = args_bytes[0]
-                        sound_name = SOUNDEFFECT_LIST.get(sound_id, f"Unknown_Sound_{sound_id:02X}")
-                        args_tuple.append(sound_name)
-                    else:
-                        args_tuple.append(args_bytes[0])
-                elif num_args == 2:
-                    args_tuple.append(struct.unpack('>H', args_bytes)[0])
-                elif num_args == 3 and command == 0x05:
-                    args_tuple.append(int.from_bytes(args_bytes, 'big'))
-                elif num_args == 3:
-                    args_tuple.extend([args_bytes[0], args_bytes[1], args_bytes[2]])
-                elif num_args == 4 and command == 0x50:
-                    args_tuple.extend([int.from_bytes(args_bytes[0:3], 'big'), args_bytes[3]])
-                else:
-                    for j in range(0, num_args, 2):
-                        args_tuple.append(struct.unpack('>H', args_bytes[j:j+2])[0])
-                try:
-                    text_buffer.append(desc.format(*args_tuple))
-                except (TypeError, IndexError):
-                    text_buffer.append(desc)
-                i += num_args
-            else:
-                text_buffer.append(desc)
-            i += 1
+            num_args = CODE_ARG_COUNT_TABLE[command]
+            args_bytes = data[i+1 : i+1+num_args]
+            if len(args_bytes) < num_args:
+                text_buffer.append(f"<Malformed Code 0x{command:02X}>")
+                i += 1 + len(args_bytes)
+                continue
+            text_buffer.append(_format_control_code(command, args_bytes))
+            i += 1 + num_args
             continue
-        char = CHARACTER_MAP.get(byte, f"[?{byte:02X}]")
-        text_buffer.append(char)
-        i += 1
+        # plain-text run: convert everything up to the next prefix/terminator in C
+        if next_prefix < i:
+            next_prefix = data.find(b"\x7f", i)
+            if next_prefix < 0:
+                next_prefix = n
+        if next_zero < i:
+            next_zero = data.find(b"\x00", i)
+            if next_zero < 0:
+                next_zero = n
+        stop = next_prefix if next_prefix < next_zero else next_zero
+        segment = data[i:stop]
+        latin1 = segment.translate(LATIN1_TABLE)
+        if 0x00 in latin1:
+            text_buffer.append(segment.decode(AC_GC_CODEC))
+        else:
+            text_buffer.append(latin1.decode("latin-1"))
+        i = stop
     return "".join(text_buffer)
 
-def encode_ac_text(text: str) -> bytes:
+@functools.lru_cache(maxsize=256)
+def _resolve_control_tag(token: str) -> Tuple[Optional[int], Tuple[int, ...]]:
+    """Command byte (None if unknown) and hex arguments for a normalized <...> tag."""
+    if "[" not in token:
+        # argument-less tags are their own REVERSE_CONTROL_CODES key
+        return REVERSE_CONTROL_CODES.get(token), ()
+    args = tuple(int(arg, 16) for arg in _TAG_ARG_RE.findall(token))
+    return REVERSE_CONTROL_CODES.get(_TAG_ARG_SLOT_RE.sub('[{}]', token)), args
+
+def encode_ac_text(text: str, return_canonical: bool = False):
+    """
+    Encode dialogue text to AC bytes. With return_canonical=True, returns
+    (encoded, canonical_text) where canonical_text equals parse_ac_text(encoded),
+    so callers predicting what the game will show can skip a re-parse.
+    """
+    encoded, canonical = _encode_ac_text_cached(text)
+    return (encoded, canonical) if return_canonical else encoded
+
+@functools.lru_cache(maxsize=_CODEC_CACHE_SIZE)
+def _encode_ac_text_cached(text: str) -> Tuple[bytes, str]:
     encoded = bytearray()
-    # normalize + sanitize
-    text = _sanitize_for_charset(_normalize_visible_text(_normalize_control_tags(text)))
-    tokens = re.split(r'(<[^>]+>)', text)
+    # what parse_ac_text will render for each emitted token; None once the
+    # stream can't be rendered token-by-token (short/long args, embedded 0x00)
+    canonical_parts: Optional[List[str]] = []
+    ended = False
     char_count = 0
-    for token in tokens:
-        if not token: continue
+    for token in _iter_encode_tokens(text):
         if token.startswith('<') and token.endswith('>'):
-            arg_pattern = re.compile(r'\[[^\]]*?([0-9a-fA-F]{1,6})\]')
-            args = [int(arg, 16) for arg in arg_pattern.findall(token)]
-            base_tag = re.sub(r'\[.*?\]', '[{}]', token)
-            command_byte = REVERSE_CONTROL_CODES.get(base_tag)
+            command_byte, args = _resolve_control_tag(token)
             if command_byte is not None:
                 encoded.append(PREFIX_BYTE)
                 encoded.append(command_byte)
-                num_args_expected = CODE_ARG_COUNT.get(command_byte, 0)
-                if num_args_expected > 0:
-                    arg_bytes = bytearray()
-                    if num_args_expected == 1:
-                        arg_bytes.extend(struct.pack('>B', args[0]))
-                    elif num_args_expected == 2:
-                        arg_bytes.extend(struct.pack('>H', args[0]))
-                    elif num_args_expected == 3 and command_byte == 0x05:
-                        arg_bytes.extend(args[0].to_bytes(3, 'big'))
-                    elif num_args_expected == 3 and command_byte in (0x08, 0x09):
-                        arg_bytes.extend(struct.pack('>B', args[0]))
-                        arg_bytes.extend(struct.pack('>H', args[1]))
-                    elif num_args_expected == 4 and command_byte == 0x50:
-                        arg_bytes.extend(args[0].to_bytes(3, 'big'))
-                        arg_bytes.extend(struct.pack('>B', args[1]))
-                    else:
-                        for arg in args:
-                            arg_bytes.extend(struct.pack('>H', arg))
-                    encoded.extend(arg_bytes)
+                packer = _ARG_PACKERS.get(command_byte)
+                arg_bytes = packer(args) if packer is not None else b""
+                encoded.extend(arg_bytes)
+                if len(arg_bytes) != CODE_ARG_COUNT_TABLE[command_byte]:
+                    canonical_parts = None
+                if canonical_parts is not None and not ended:
+                    canonical_parts.append(_format_control_code(command_byte, arg_bytes))
+                    ended = command_byte == 0x00
             else:
                 print(f"Warning: Unknown tag '{token}'")
         else:
+            # most runs are fully encodable: translate the whole run once and
+            # slice each word out of it (one byte per char) instead of per word
+            mapped_token = None
+            if _REVERSE_ASCII_CHARS.issuperset(token):
+                mapped_token = token.encode("latin-1").translate(REVERSE_ASCII)
             words = token.split(' ')
+            word_start = 0
             for word_idx, word in enumerate(words):
                 word_length = len(word)
+                word_offset = word_start
+                word_start += word_length + 1
                 space_needed = 1 if word_idx > 0 and char_count > 0 else 0
                 if char_count > 0 and char_count + space_needed + word_length > 30:
                     encoded.append(0xCD)  # newline
+                    if canonical_parts is not None and not ended:
+                        canonical_parts.append(CHAR_TABLE[0xCD])
                     char_count = 0
                     space_needed = 0
                 if space_needed > 0:
                     encoded.append(0x20)
+                    if canonical_parts is not None and not ended:
+                        canonical_parts.append(CHAR_TABLE[0x20])
                     char_count += 1
+                if mapped_token is not None or _REVERSE_ASCII_CHARS.issuperset(word):
+                    if mapped_token is not None:
+                        mapped = mapped_token[word_offset:word_start - 1]
+                    else:
+                        mapped = word.encode("latin-1").translate(REVERSE_ASCII)
+                    encoded.extend(mapped)
+                    if 0x00 in mapped:
+                        canonical_parts = None
+                    elif canonical_parts is not None and not ended:
+                        canonical_parts.append(word)  # CHAR_TABLE round-trips every single-char key
+                    last_newline = word.rfind("\n")
+                    char_count = word_length - last_newline - 1 if last_newline >= 0 else char_count + word_length
+                    continue
                 for char in word:
                     byte_val = REVERSE_CHARACTER_MAP.get(char)
                     if byte_val is not None:
                         encoded.append(byte_val)
+                        if byte_val == 0x00:
+                            canonical_parts = None
+                        elif canonical_parts is not None and not ended:
+                            canonical_parts.append(CHAR_TABLE[byte_val])
                         if char == '\n':
                             char_count = 0
                         else:
@@ -413,7 +599,10 @@ def encode_ac_text(text: str) -> bytes:
                         # already sanitized; shouldn't hit here often
                         pass
     encoded.append(0x00)
-    return bytes(encoded)
+    encoded = bytes(encoded)
+    if canonical_parts is None:
+        return encoded, parse_ac_text(encoded)
+    return encoded, "".join(canonical_parts)
 
 # --- Start menu matcher (stubbed false by design here) -----------------------
 
@@ -423,41 +612,57 @@ def is_start_menu_time_announcement(text: str) -> bool:
 
 # --- Memory read/write helpers -----------------------------------------------
 
-def write_dialogue_to_address(dialogue: str, target_address: int) -> bool:
+def write_dialogue_to_address(dialogue: str, target_address: int, reconnect: bool = True) -> bool:
+    return _write_bytes_to_address(encode_ac_text(dialogue), target_address, reconnect)
+
+def _write_bytes_to_address(encoded_bytes: bytes, target_address: int, reconnect: bool = True) -> bool:
+    """
+    write_dialogue_to_address for text that is already AC-encoded.
+    reconnect=False fails instead of calling memory_ipc.connect(), which rebinds
+    the shared connection; threads other than the poll loop must not do that.
+    """
     wrote = memory_ipc.write_memory(target_address, b"")
     if wrote is False:
+        if not reconnect:
+            return False
         if not memory_ipc.connect():
             print("❌ Connection failed. Is the game running?")
             return False
-    encoded_bytes = encode_ac_text(dialogue)
     return memory_ipc.write_memory(target_address, encoded_bytes)
 
+# shown while the LLM call is in flight; fixed, so encoded once at import
+_LOADING_TEXT_BYTES = encode_ac_text(".<Pause [0A]>.<Pause [0A]>.<Pause [0A]><Press A><Clear Text>")
+
 def _read_dialogue_once(target_address: int, end_markers: List[bytes], max_size: int, chunk_size: int) -> bytes:
-    full_data = bytearray()
-    for i in range(0, max_size, chunk_size):
-        chunk = memory_ipc.read_memory(target_address + i, chunk_size)
-        if not chunk:
-            break
-        full_data.extend(chunk)
-        if any(marker in chunk for marker in end_markers):
-            break
+    # One IPC round-trip for the whole window, then trim to the end of the
+    # chunk holding the first end marker (what the old chunked read returned).
+    full_data = memory_ipc.read_memory(target_address, max_size)
+    if not full_data:
+        return b""
+    marker_ends = [
+        idx + len(marker)
+        for marker, idx in ((marker, full_data.find(marker)) for marker in end_markers)
+        if idx >= 0
+    ]
+    if marker_ends:
+        end = ((min(marker_ends) - 1) // chunk_size + 1) * chunk_size
+        return bytes(full_data[:end])
     return bytes(full_data)
 
+# first C0 control byte or DEL ends the speaker name (covers the NUL terminator too)
+_SPEAKER_CTRL_RE = re.compile(rb"[\x00-\x1f\x7f]")
+
 def get_current_speaker() -> Optional[str]:
     raw_bytes = memory_ipc.read_memory(0x8129A3EA, 32)
-    if not raw_bytes or all(b == 0 for b in raw_bytes):
+    if not raw_bytes or not raw_bytes.strip(b"\x00"):
         return None
-    candidate = raw_bytes.split(b"\x00", 1)[0]
-    for idx, byte in enumerate(candidate):
-        if byte < 0x20 or byte == 0x7F:
-            candidate = candidate[:idx]
-            break
+    candidate = _SPEAKER_CTRL_RE.split(raw_bytes, 1)[0]
     try:
         speaker = candidate.decode("utf-8", errors="ignore")
     except Exception:
         return None
-    import re as _re
-    speaker = _re.sub(r"[\x00-\x1F\x7F]+$", "", speaker).rstrip()
+    # control bytes were cut above, so only trailing whitespace can remain
+    speaker = speaker.rstrip()
     return speaker or None
 
 # --- Screenshot helpers -------------------------------------------------------
@@ -486,6 +691,61 @@ def _take_dolphin_window_screenshot() -> Optional[str]:
 
 # --- Main watch loop ----------------------------------------------------------
 
+# (addr, initial_text, speaker, gossip_context)
+GenerationJob = Tuple[int, str, Optional[str], Optional[Dict]]
+# (addr, canonical text written or None, monotonic write time, connection lost)
+GenerationResult = Tuple[int, Optional[str], float, bool]
+
+def _generation_worker(
+    gen_queue: "queue.Queue[GenerationJob]",
+    done_queue: "queue.Queue[GenerationResult]",
+    enable_screenshot: bool,
+) -> None:
+    """
+    Runs watch_dialogue's LLM round-trips off the poll thread. Every job gets
+    exactly one result on done_queue, whatever happens during it, so the poll
+    loop never leaves an address marked as generating. Writes don't reconnect:
+    the poll loop reads through the same connection, so a lost connection is
+    reported back and re-established there.
+    """
+    while True:
+        addr, initial_text, speaker, gossip_ctx = gen_queue.get()
+        predicted: Optional[str] = None
+        written_at = 0.0
+        lost_connection = False
+        try:
+            with GLOBAL_GENERATION_LOCK:
+                if not _write_bytes_to_address(_LOADING_TEXT_BYTES, addr, reconnect=False):
+                    lost_connection = True
+                    continue
+
+                image_paths = None
+                if enable_screenshot:
+                    time.sleep(0.15)
+                    shot = _take_dolphin_window_screenshot()
+                    if shot:
+                        image_paths = [shot]
+
+                if is_start_menu_time_announcement(initial_text) and speaker:
+                    llm_text = generate_spotlight_dialogue(
+                        speaker, image_paths=image_paths, gossip_context=gossip_ctx
+                    )
+                else:
+                    llm_text = generate_dialogue(
+                        speaker or "Ace", image_paths=image_paths, gossip_context=gossip_ctx
+                    )
+
+                if not write_dialogue_to_address(llm_text, addr, reconnect=False):
+                    lost_connection = True
+                    continue
+                written_at = time.monotonic()
+                _, predicted = encode_ac_text(llm_text, return_canonical=True)
+        # the memory readers sys.exit() on some failures; that must not kill the worker
+        except (Exception, SystemExit) as e:
+            print(f"⚠ generation error: {e!r}")
+        finally:
+            done_queue.put((addr, predicted, written_at, lost_connection))
+
 def watch_dialogue(
     addresses: List[int],
     per_read_size: int,
@@ -497,43 +757,86 @@ def watch_dialogue(
         sys.exit(1)
 
     last_text_by_addr: Dict[int, Optional[str]] = {addr: None for addr in addresses}
+    # raw bytes seen last tick; cleared after we write so the next read is re-parsed
+    last_raw_by_addr: Dict[int, bytes] = {addr: b"" for addr in addresses}
     generation_in_progress: Dict[int, bool] = {addr: False for addr in addresses}
     suppress_until_by_addr: Dict[int, float] = {addr: 0.0 for addr in addresses}
     conversation_state: Dict[int, ConversationState] = {addr: ConversationState() for addr in addresses}
     seen_characters = set()
+    # sorted(seen_characters), rebuilt only when a new speaker shows up
+    villager_list: List[str] = []
     enable_screenshot = os.environ.get("ENABLE_SCREENSHOT", "0") == "1"
     enable_gossip = os.environ.get("ENABLE_GOSSIP", "0") == "1"
 
+    # LLM round-trips run on a worker thread so polling keeps ticking. The worker
+    # only touches game memory; its results come back through done_queue and are
+    # applied by the poll loop, so all of the watch state above stays on one thread.
+    # Gossip context is gathered before queueing too: gossip.py rewrites its state
+    # file unlocked, and the poll loop's seed/spread calls touch the same file.
+    gen_queue: "queue.Queue[GenerationJob]" = queue.Queue()
+    done_queue: "queue.Queue[GenerationResult]" = queue.Queue()
+    threading.Thread(
+        target=_generation_worker, args=(gen_queue, done_queue, enable_screenshot), daemon=True
+    ).start()
+
+    # fixed-rate ticks: sleep until the next deadline rather than a full
+    # interval after the work, so read/parse time doesn't stretch the period
+    next_tick = time.monotonic()
     try:
         while True:
+            # one clock read per poll; monotonic so wall-clock jumps can't skew suppression
+            now_ts = time.monotonic()
+
+            while True:
+                try:
+                    addr, predicted, written_at, lost_connection = done_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if lost_connection and not memory_ipc.connect():
+                    print("❌ Connection failed. Is the game running?")
+                generation_in_progress[addr] = False
+                state = conversation_state[addr]
+                state.menu_injected = False
+                state.awaiting_choice_resolution = False
+                print(f"Did generate: {predicted is not None}")
+                if predicted is not None:
+                    last_text_by_addr[addr] = predicted
+                    last_raw_by_addr[addr] = b""
+                    suppress_until_by_addr[addr] = written_at + SUPPRESS_SECONDS
+
             try:
                 current_speaker = get_current_speaker()
             except Exception:
                 current_speaker = None
 
-            if current_speaker is not None:
+            if current_speaker is not None and current_speaker not in seen_characters:
                 seen_characters.add(current_speaker)
+                villager_list = sorted(seen_characters)
 
-            if seen_characters and enable_gossip:
+            if villager_list and enable_gossip:
                 try:
-                    villager_list = sorted(seen_characters)
                     seed_if_needed(villager_list)
                     spread(villager_list)
                 except Exception:
                     pass
 
             for addr in addresses:
+                if generation_in_progress[addr]:
+                    # the worker owns this buffer until its result is applied
+                    continue
                 raw = memory_ipc.read_memory(addr, per_read_size)
                 if not raw:
                     continue
+                if raw == last_raw_by_addr[addr] and not print_all:
+                    continue
+                last_raw_by_addr[addr] = raw
                 text = parse_ac_text(raw)
 
                 if print_all or text != last_text_by_addr[addr]:
                     state = conversation_state[addr]
                     state.observe_text(text)
 
-                    now_ts = time.time()
-                    if now_ts < suppress_until_by_addr.get(addr, 0.0):
+                    if now_ts < suppress_until_by_addr[addr]:
                         if "<End Conversation>" in text:
                             suppress_until_by_addr[addr] = 0.0
                             state.reset()
@@ -548,13 +851,14 @@ def watch_dialogue(
                     ):
                         modified = _inject_feeling_chatty_option(text)
                         if modified and modified != text:
-                            predicted = parse_ac_text(encode_ac_text(modified))
+                            _, predicted = encode_ac_text(modified, return_canonical=True)
                             if write_dialogue_to_address(modified, addr):
                                 print("✨ Injected 'Feeling chatty' option into choice menu.")
                                 state.menu_injected = True
                                 state.awaiting_choice_resolution = True
                                 text = predicted
                                 last_text_by_addr[addr] = predicted
+                                last_raw_by_addr[addr] = b""
                                 header = f"Address 0x{addr:08X}"
                                 if include_speaker:
                                     try:
@@ -580,18 +884,13 @@ def watch_dialogue(
                         )
                         state.menu_skip_logged = True
 
-                    did_generate = False
                     should_generate = state.chatty_requested and not state.awaiting_choice_resolution
+                    queued = False
 
-                    if (
-                        should_generate
-                        and not generation_in_progress.get(addr, False)
-                        and not GLOBAL_GENERATION_LOCK.locked()
-                    ):
+                    if should_generate and not generation_in_progress[addr]:
                         state.chatty_requested = False
                         generation_in_progress[addr] = True
 
-                        initial_text = text
                         current_speaker_for_gen: Optional[str] = None
                         if include_speaker:
                             try:
@@ -599,59 +898,20 @@ def watch_dialogue(
                             except Exception:
                                 current_speaker_for_gen = None
 
-                        loading_text = ".<Pause [0A]>.<Pause [0A]>.<Pause [0A]><Press A><Clear Text>"
-
-                        with GLOBAL_GENERATION_LOCK:
-                            write_dialogue_to_address(loading_text, addr)
-
-                            image_paths = None
-                            if enable_screenshot:
-                                time.sleep(0.15)
-                                shot = _take_dolphin_window_screenshot()
-                                if shot:
-                                    image_paths = [shot]
-
-                            gossip_ctx = None
-                            if enable_gossip and current_speaker_for_gen:
-                                try:
-                                    observe_interaction(current_speaker_for_gen, villager_names=sorted(seen_characters))
-                                    gossip_ctx = get_context_for(
-                                        current_speaker_for_gen, villager_names=sorted(seen_characters)
-                                    )
-                                except Exception:
-                                    gossip_ctx = None
-
+                        gossip_ctx = None
+                        if enable_gossip and current_speaker_for_gen:
                             try:
-                                if is_start_menu_time_announcement(initial_text) and current_speaker_for_gen:
-                                    llm_text = generate_spotlight_dialogue(
-                                        current_speaker_for_gen, image_paths=image_paths, gossip_context=gossip_ctx
-                                    )
-                                elif current_speaker_for_gen:
-                                    llm_text = generate_dialogue(
-                                        current_speaker_for_gen, image_paths=image_paths, gossip_context=gossip_ctx
-                                    )
-                                else:
-                                    llm_text = generate_dialogue(
-                                        "Ace", image_paths=image_paths, gossip_context=gossip_ctx
-                                    )
-
-                                combined = llm_text
-                                write_dialogue_to_address(combined, addr)
-
-                                encoded_combined = encode_ac_text(combined)
-                                predicted = parse_ac_text(encoded_combined)
-                                last_text_by_addr[addr] = predicted
+                                observe_interaction(current_speaker_for_gen, villager_names=villager_list)
+                                gossip_ctx = get_context_for(
+                                    current_speaker_for_gen, villager_names=villager_list
+                                )
+                            except Exception:
+                                gossip_ctx = None
 
-                                suppress_until_by_addr[addr] = time.time() + SUPPRESS_SECONDS
-                                did_generate = True
-                            except Exception as e:
-                                print(f"⚠ generation error: {e}")
-                            finally:
-                                generation_in_progress[addr] = False
-                                state.menu_injected = False
-                                state.awaiting_choice_resolution = False
+                        gen_queue.put((addr, text, current_speaker_for_gen, gossip_ctx))
+                        queued = True
 
-                    print(f"Did generate: {did_generate}")
+                    print(f"Generation queued: {queued}")
                     header = f"Address 0x{addr:08X}"
                     if include_speaker:
                         try:
@@ -661,14 +921,19 @@ def watch_dialogue(
                             pass
                     print(f"\n--- {header} ---")
                     print(text)
-                    if not did_generate:
+                    if not queued:
                         last_text_by_addr[addr] = text
                         if "<End Conversation>" in text:
                             state.reset()
                         elif not state.awaiting_choice_resolution:
                             state.chatty_requested = False
 
-            time.sleep(max(0.0, interval_s))
+            next_tick += interval_s
+            now = time.monotonic()
+            if next_tick < now:
+                # fell more than a tick behind: resync instead of bursting to catch up
+                next_tick = now
+            time.sleep(next_tick - now)
     except KeyboardInterrupt:
         return
 
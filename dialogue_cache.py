@@ -0,0 +1,151 @@
+"""
+dialogue_cache.py
+Persistent cache of LLM chat completions, so a repeated prompt is answered
+from disk instead of another API round-trip.
+
+- Keyed by SHA-256 of (model, sampling params, messages); screenshots are part
+  of the messages, so a different image is a different key.
+- Entries expire after a TTL; the least recently used are evicted past a cap.
+- Stored in SQLite so the cache survives restarts.
+- Exposes lookup(key), store(key, text), make_key(...), stats().
+
+ENV:
+  ENABLE_DIALOGUE_CACHE=0            # opt-in: replies are sampled, a hit repeats one verbatim
+  DIALOGUE_CACHE_PATH=./dialogue_cache.sqlite3
+  DIALOGUE_CACHE_TTL=3600            # seconds
+  DIALOGUE_CACHE_MAX_ENTRIES=2000
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+ENABLED = os.environ.get("ENABLE_DIALOGUE_CACHE", "0") == "1"
+DEFAULT_CACHE_PATH = os.environ.get(
+    "DIALOGUE_CACHE_PATH", os.path.join(os.getcwd(), "dialogue_cache.sqlite3")
+)
+TTL_SECONDS = float(os.environ.get("DIALOGUE_CACHE_TTL", "3600"))
+MAX_ENTRIES = int(os.environ.get("DIALOGUE_CACHE_MAX_ENTRIES", "2000"))
+
+
+def make_key(model: str, temperature: float, max_tokens: int, messages: Any) -> str:
+    payload = json.dumps(
+        [model, temperature, max_tokens, messages], ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """SQLite-backed completion cache with TTL expiry and LRU eviction."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers(last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response, created FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    self.hits += 1
+                    return row[0]
+                if row is not None:
+                    conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    conn.commit()
+            except sqlite3.Error:
+                pass
+            self.misses += 1
+            return None
+
+    def store(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO answers (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+                conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM answers WHERE key IN ("
+                    " SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def stats(self, count_entries: bool = True) -> Dict[str, Any]:
+        """Hit/miss counters; count_entries=False reports 0 entries without opening the database."""
+        with self._lock:
+            entries = 0
+            if count_entries:
+                try:
+                    entries = self._connect().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+                except sqlite3.Error:
+                    entries = 0
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": entries,
+            }
+
+
+_DEFAULT_CACHE: Optional[AnswerCache] = None
+
+
+def _default_cache() -> AnswerCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = AnswerCache()
+    return _DEFAULT_CACHE
+
+
+def lookup(key: str) -> Optional[str]:
+    if not ENABLED:
+        return None
+    return _default_cache().lookup(key)
+
+
+def store(key: str, response: str) -> None:
+    if ENABLED:
+        _default_cache().store(key, response)
+
+
+def stats() -> Dict[str, Any]:
+    # with the cache off, don't create the database file just to count it
+    return _default_cache().stats(count_entries=ENABLED)
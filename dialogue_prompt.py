@@ -20,23 +20,51 @@ ENV (via .env):
   OPENAI_BASE=...                    # optional (OpenAI-compatible base, overrides BASE_URL if using OpenAI client)
   MODEL=openai/gpt-4o-mini
   TEMPERATURE=0.7
+  IMAGE_MAX_EDGE=768                 # screenshots are downscaled to this long edge
+  IMAGE_JPEG_QUALITY=75              # ...and sent as JPEG
   ENABLE_GOSSIP=1
+  ENABLE_DIALOGUE_CACHE=0            # opt-in: reuse completions for identical prompts (see dialogue_cache.py)
 """
 
 import os
+import io
 import re
 import json
 import base64
+import functools
+import hashlib
+import threading
 import requests
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Any
+from PIL import Image
+
+# optional faster JSON parser (pip install orjson); stdlib json otherwise
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# optional SIMD base64 (pip install pybase64); stdlib base64 otherwise
+try:
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    def _b64encode_str(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
 
 from dotenv import load_dotenv
 load_dotenv()
 
+import dialogue_cache
+
 # -------------------- configuration --------------------
 
 MODEL = os.getenv("MODEL", "openai/gpt-4o-mini")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "768"))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "75"))
 USE_GOSSIP = os.getenv("ENABLE_GOSSIP", "1") == "1"
 
 # prefer OpenRouter
@@ -61,18 +89,67 @@ if not OPENROUTER_API_KEY and OPENAI_API_KEY:
         _openai_import_err = _e
         _openai_client = None
 
+# one pooled keep-alive session, so repeat calls skip the TCP+TLS handshake
+_SESSION: Optional[requests.Session] = None
+
+def get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            # optional but recommended metadata
+            "HTTP-Referer": "http://localhost",
+            "X-Title": "Animal Crossing LLM Mod",
+        })
+        retries = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        _SESSION = session
+    return _SESSION
+
 # -------------------- utils --------------------
 
+# data URLs of recent screenshots, keyed by a hash of the file contents, so an
+# unchanged frame skips the decode/downscale/JPEG/base64 work
+_DATA_URL_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_DATA_URL_CACHE_SIZE = 8
+_DATA_URL_CACHE_LOCK = threading.Lock()
+
+def _encode_image_bytes_to_data_url(raw: bytes) -> str:
+    key = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    with _DATA_URL_CACHE_LOCK:
+        cached = _DATA_URL_CACHE.get(key)
+        if cached is not None:
+            _DATA_URL_CACHE.move_to_end(key)
+            return cached
+    # the model tiles images at 512px anyway: downscale and send JPEG, not the full PNG
+    with Image.open(io.BytesIO(raw)) as img:
+        img.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, "JPEG", quality=IMAGE_JPEG_QUALITY)
+    data_url = f"data:image/jpeg;base64,{_b64encode_str(buf.getvalue())}"
+    with _DATA_URL_CACHE_LOCK:
+        _DATA_URL_CACHE[key] = data_url
+        if len(_DATA_URL_CACHE) > _DATA_URL_CACHE_SIZE:
+            _DATA_URL_CACHE.popitem(last=False)
+    return data_url
+
 def _encode_image_to_data_url(image_path: str) -> Optional[str]:
     try:
         with open(image_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        return f"data:image/png;base64,{b64}"
+            return _encode_image_bytes_to_data_url(f.read())
     except Exception as e:
         print(f"⚠ could not read screenshot '{image_path}': {e}")
         return None
 
-def _build_messages(system_prompt: str, user_prompt: str, image_paths: Optional[List[str]]) -> List[Dict[str, Any]]:
+def _build_messages(context_prompt: str, user_prompt: str, image_paths: Optional[List[str]]) -> List[Dict[str, Any]]:
     user_content: List[Dict[str, Any]] = [{"type": "text", "text": user_prompt}]
     if image_paths:
         for p in image_paths:
@@ -82,32 +159,55 @@ def _build_messages(system_prompt: str, user_prompt: str, image_paths: Optional[
                     "type": "image_url",
                     "image_url": {"url": data_url}
                 })
+    # static preamble first and byte-identical on every call, so providers can
+    # reuse its cached prefix; per-villager context follows in its own message
     return [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": _STATIC_SYSTEM_PROMPT},
+        {"role": "system", "content": context_prompt},
         {"role": "user", "content": user_content},
     ]
 
-def _post_to_openrouter(messages: List[Dict[str, Any]], max_tokens: int) -> str:
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        # optional but recommended metadata
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Animal Crossing LLM Mod",
+def _with_cache_control(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Anthropic only caches prompt prefixes that are explicitly marked
+    first = messages[0]
+    marked = {
+        "role": first["role"],
+        "content": [{"type": "text", "text": first["content"], "cache_control": {"type": "ephemeral"}}],
     }
+    return [marked] + messages[1:]
+
+# stand-in for an empty completion; shown, but never cached
+_EMPTY_REPLY = "(silence)"
+
+def _post_to_openrouter(messages: List[Dict[str, Any]], max_tokens: int) -> str:
     payload = {
         "model": MODEL,
         "temperature": TEMPERATURE,
         "max_tokens": max_tokens,
-        "messages": messages,
+        "stream": True,
+        "messages": _with_cache_control(messages) if MODEL.startswith("anthropic/") else messages,
     }
     url = f"{BASE_URL.rstrip('/')}/chat/completions"
-    r = requests.post(url, headers=headers, data=json.dumps(payload))
-    if r.status_code != 200:
-        raise RuntimeError(f"OpenRouter error {r.status_code}: {r.text}")
-    data = r.json()
-    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-    return (content or "").strip() or "(silence)"
+    # streamed: the read timeout covers the gap between chunks, not the whole reply
+    with get_session().post(url, json=payload, timeout=(3.05, 30), stream=True) as r:
+        if r.status_code != 200:
+            raise RuntimeError(f"OpenRouter error {r.status_code}: {r.text}")
+        parts: List[str] = []
+        # raw bytes, not decode_unicode: a text/event-stream reply without a charset
+        # would be decoded as ISO-8859-1; json.loads reads the bytes as UTF-8
+        for line in r.iter_lines():
+            # SSE: "data: {json}" events; ":" lines are keep-alive comments
+            if not line or not line.startswith(b"data:"):
+                continue
+            chunk = line[5:].strip()
+            if chunk == b"[DONE]":
+                break
+            data = json.loads(chunk)
+            if "error" in data:
+                raise RuntimeError(f"OpenRouter error: {data['error']}")
+            delta = (data.get("choices") or [{}])[0].get("delta") or {}
+            parts.append(delta.get("content") or "")
+    return "".join(parts).strip() or _EMPTY_REPLY
 
 def _post_to_openai(messages: List[Dict[str, Any]], max_tokens: int) -> str:
     if _openai_client is None:
@@ -119,16 +219,26 @@ def _post_to_openai(messages: List[Dict[str, Any]], max_tokens: int) -> str:
         messages=messages,
     )
     txt = (resp.choices[0].message.content or "").strip()
-    return txt or "(silence)"
+    return txt or _EMPTY_REPLY
 
-def _call_chat(system_prompt: str, user_prompt: str, image_paths: Optional[List[str]], max_tokens: int = 220) -> str:
-    messages = _build_messages(system_prompt, user_prompt, image_paths)
+def _call_chat(context_prompt: str, user_prompt: str, image_paths: Optional[List[str]], max_tokens: int = 220) -> str:
+    messages = _build_messages(context_prompt, user_prompt, image_paths)
     try:
-        if OPENROUTER_API_KEY:
-            return _post_to_openrouter(messages, max_tokens)
-        # fallback path
-        if OPENAI_API_KEY:
-            return _post_to_openai(messages, max_tokens)
+        if OPENROUTER_API_KEY or OPENAI_API_KEY:
+            # only real completions are cached, never the empty-reply placeholder
+            # or the fallback lines below
+            cache_key = dialogue_cache.make_key(MODEL, TEMPERATURE, max_tokens, messages)
+            cached = dialogue_cache.lookup(cache_key)
+            if cached is not None:
+                return cached
+            if OPENROUTER_API_KEY:
+                text = _post_to_openrouter(messages, max_tokens)
+            else:
+                # fallback path
+                text = _post_to_openai(messages, max_tokens)
+            if text != _EMPTY_REPLY:
+                dialogue_cache.store(cache_key, text)
+            return text
         print("⚠ no API key found (OPENROUTER_API_KEY or OPENAI_API_KEY). returning fallback line.")
         return "…(the wind rustles; nobody answers)…"
     except Exception as e:
@@ -137,26 +247,20 @@ def _call_chat(system_prompt: str, user_prompt: str, image_paths: Optional[List[
 
 # -------------------- villager data --------------------
 
-_VILLAGERS_CACHE: Optional[Dict[str, Dict[str, Any]]] = None
-
+@functools.lru_cache(maxsize=None)
 def _load_villagers() -> Dict[str, Dict[str, Any]]:
-    global _VILLAGERS_CACHE
-    if _VILLAGERS_CACHE is not None:
-        return _VILLAGERS_CACHE
     paths = [
         "villagers.json",
         os.path.join(os.path.dirname(__file__), "villagers.json"),
     ]
     for path in paths:
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                _VILLAGERS_CACHE = json.load(f) or {}
-                return _VILLAGERS_CACHE
+            with open(path, "rb") as f:
+                return _json_loads(f.read()) or {}
         except Exception:
             continue
     print("⚠ villagers.json not found; using empty map")
-    _VILLAGERS_CACHE = {}
-    return _VILLAGERS_CACHE
+    return {}
 
 def _sanitize_name(name: Optional[str]) -> Optional[str]:
     if not name:
@@ -170,7 +274,9 @@ def _sanitize_name(name: Optional[str]) -> Optional[str]:
 def _title_name(s: str) -> str:
     return s[:1].upper() + s[1:] if s else s
 
-def _get_profile(name: Optional[str]) -> Dict[str, Any]:
+@functools.lru_cache(maxsize=256)
+def _resolve_profile(name: Optional[str]) -> tuple:
+    # the same speaker is asked for tick after tick; resolve each name once
     villagers = _load_villagers()
     clean = _sanitize_name(name) or "Unknown"
     for candidate in (clean, clean.title(), _title_name(clean)):
@@ -178,15 +284,19 @@ def _get_profile(name: Optional[str]) -> Dict[str, Any]:
             data = dict(villagers[candidate])
             data.setdefault("name", candidate)
             data.setdefault("modded", False)
-            return data
-    return {
-        "name": clean,
-        "modded": True,
-        "personality": "normal",
-        "species": "unknown",
-        "catchphrase": "",
-        "style": "",
-    }
+            return tuple(data.items())
+    return (
+        ("name", clean),
+        ("modded", True),
+        ("personality", "normal"),
+        ("species", "unknown"),
+        ("catchphrase", ""),
+        ("style", ""),
+    )
+
+def _get_profile(name: Optional[str]) -> Dict[str, Any]:
+    # fresh dict per call, so callers can't mutate the cached profile
+    return dict(_resolve_profile(name))
 
 # -------------------- prompt building --------------------
 
@@ -204,6 +314,9 @@ _DECORATION_RULES = (
     "- If multiple beats, end with '<Press A><Clear Text>'.\n"
 )
 
+# shared by every request; keep anything call-specific out of it
+_STATIC_SYSTEM_PROMPT = "\n".join([_BASE_STYLE, _DECORATION_RULES])
+
 def _gossip_snippet(gossip_context: Optional[Dict[str, Any]]) -> str:
     if not (USE_GOSSIP and gossip_context):
         return ""
@@ -241,9 +354,7 @@ def generate_dialogue(
 ) -> str:
     profile = _get_profile(villager_name)
 
-    system_prompt = "\n".join([
-        _BASE_STYLE,
-        _DECORATION_RULES,
+    context_prompt = "\n".join([
         _persona_blurb(profile),
         _gossip_snippet(gossip_context),
         "Respond as the villager speaking to the player.",
@@ -255,7 +366,7 @@ def generate_dialogue(
         "Finish with '<Press A><Clear Text>' if you used multiple beats."
     )
 
-    text = _call_chat(system_prompt, user_prompt, image_paths=image_paths, max_tokens=220)
+    text = _call_chat(context_prompt, user_prompt, image_paths=image_paths, max_tokens=220)
     return _postprocess(text)
 
 def generate_spotlight_dialogue(
@@ -265,9 +376,7 @@ def generate_spotlight_dialogue(
 ) -> str:
     profile = _get_profile(villager_name)
 
-    system_prompt = "\n".join([
-        _BASE_STYLE,
-        _DECORATION_RULES,
+    context_prompt = "\n".join([
         _persona_blurb(profile),
         _gossip_snippet(gossip_context),
         "Create a short, welcoming 'spotlight' blurb (like a title-card quip).",
@@ -278,7 +387,7 @@ def generate_spotlight_dialogue(
         "Optionally include one <Pause [0A]> for timing."
     )
 
-    text = _call_chat(system_prompt, user_prompt, image_paths=image_paths, max_tokens=160)
+    text = _call_chat(context_prompt, user_prompt, image_paths=image_paths, max_tokens=160)
     return _postprocess(text)
 
 # -------------------- output cleanup --------------------
@@ -287,12 +396,15 @@ CONTROL_SAFE = [
     "<Press A>", "<Clear Text>", "<Pause [0A]>", "<Pause [05]>", "<Pause [14]>"
 ]
 
+# a tag is kept when it starts like a whitelisted one (e.g. "<Pause [0A]");
+# the first branch captures those, so "\1" is the tag itself or empty
+_FORBIDDEN_TAG_RE = re.compile(
+    r"(?=<(?:%s))(<[^>]{1,40}>)|<[^>]{1,40}>" % "|".join(re.escape(x[1:-1]) for x in CONTROL_SAFE)
+)
+
 def _strip_forbidden_codes(s: str) -> str:
     # allow a small whitelist; strip unknown angle-bracket blocks
-    def repl(m):
-        frag = m.group(0)
-        return frag if any(frag.startswith(x[:-1]) for x in CONTROL_SAFE) else ""
-    return re.sub(r"<[^>]{1,40}>", repl, s)
+    return _FORBIDDEN_TAG_RE.sub(r"\1", s)
 
 def _trim_lines(s: str) -> str:
     # keep lines short-ish; encoder wraps too, but this helps
@@ -302,19 +414,20 @@ def _trim_lines(s: str) -> str:
         if len(t) <= 90:
             out.append(t)
             continue
-        # soft wrap ~30 chars at spaces
-        buf = ""
-        parts: List[str] = []
+        # soft wrap ~30 chars at spaces; collect words and join once per line
+        words: List[str] = []
+        cur = 0
         for word in t.split():
-            if len(buf) + (1 if buf else 0) + len(word) > 30:
-                if buf:
-                    parts.append(buf)
-                buf = word
+            add = len(word) + (1 if words else 0)
+            if words and cur + add > 30:
+                out.append(" ".join(words))
+                words = [word]
+                cur = len(word)
             else:
-                buf = word if not buf else f"{buf} {word}"
-        if buf:
-            parts.append(buf)
-        out.extend(parts)
+                words.append(word)
+                cur += add
+        if words:
+            out.append(" ".join(words))
     return "\n".join(out)
 
 def _postprocess(text: str) -> str:
@@ -86,6 +86,24 @@ class MemoryIPC:
 
         return self.reader.read_memory(real_addr, size)
 
+    def read_memory_bulk(self, gc_address: int, size: int) -> Optional[bytes]:
+        """
+        Read a large contiguous range in a single call, instead of one
+        round-trip per small block.
+
+        Args:
+            gc_address: GameCube virtual address of the first byte
+            size: Number of bytes to read; the whole range must lie in main memory
+
+        Returns:
+            bytes data (may be short if the read stopped early) or None if failed
+        """
+        real_addr = self._gc_to_real_addr(gc_address)
+        if real_addr is None or self._gc_to_real_addr(gc_address + size - 1) is None:
+            return None
+
+        return self.reader.read_memory(real_addr, size)
+
     def write_memory(self, gc_address: int, data: bytes) -> bool:
         """
         Write a block of memory to GameCube address.
@@ -236,6 +254,14 @@ def read_memory(gc_address: int, size: int) -> Optional[bytes]:
     return _ipc.read_memory(gc_address, size)
 
 
+def read_memory_bulk(gc_address: int, size: int) -> Optional[bytes]:
+    """Read a large memory range in one call."""
+    if not _ipc or not _ipc.connected:
+        print("❌ Not connected. Call connect() first.")
+        return None
+    return _ipc.read_memory_bulk(gc_address, size)
+
+
 def read_word(gc_address: int) -> Optional[int]:
     """Read 32-bit word."""
     if not _ipc or not _ipc.connected:
@@ -1,3 +1,5 @@
+import codecs
+
 from memory_ipc import connect, read_memory
 
 DIALOGUE_ADDR = 0x803F14F0  # start of current villager dialogue
@@ -24,13 +26,13 @@ AC_ENCODING = {   # basic set – we can extend it
     0x80: '…', 0x8E: "'", 0x9A: '♥'
 }
 
+# 256-char charmap: byte b decodes to _DECODE_TABLE[b] in one C pass
+# (0x00 never reaches it -- the string ends there)
+_DECODE_TABLE = ''.join(AC_ENCODING.get(b) or '?' for b in range(256))
+
 def decode_dialogue(raw):
-    result = []
-    for b in raw:
-        if b == 0x00:  # end of string
-            break
-        result.append(AC_ENCODING.get(b, '?'))
-    return ''.join(result)
+    text = raw.split(b'\x00', 1)[0]  # end of string
+    return codecs.charmap_decode(text, 'strict', _DECODE_TABLE)[0]
 
 def main():
     print("Connecting...")
@@ -1,5 +1,8 @@
+import itertools
+import operator
+import re
 import time
-from memory_ipc import connect, read_memory
+from memory_ipc import connect, read_memory, read_memory_bulk
 
 START_ADDR = 0x80000000
 END_ADDR   = 0x80200000
@@ -7,7 +10,14 @@ CHUNK_SIZE = 0x100  # 256 bytes per block
 
 def snapshot_memory():
     data = {}
-    addr = START_ADDR
+    # one bulk read for the whole window, sliced into blocks
+    buf = read_memory_bulk(START_ADDR, END_ADDR - START_ADDR) or b""
+    mv = memoryview(buf)
+    whole = len(mv) // CHUNK_SIZE
+    for i in range(whole):
+        data[START_ADDR + i * CHUNK_SIZE] = bytes(mv[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE])
+    # fall back to per-block reads for anything the bulk read didn't cover
+    addr = START_ADDR + whole * CHUNK_SIZE
     while addr < END_ADDR:
         block = read_memory(addr, CHUNK_SIZE)
         if block:
@@ -16,11 +26,19 @@ def snapshot_memory():
     return data
 
 def diff_blocks(before, after):
+    if list(before) == list(after):
+        # same blocks in the same order: pair them up and compare in C
+        return list(itertools.compress(before, map(operator.ne, before.values(), after.values())))
     return [addr for addr in before if addr in after and before[addr] != after[addr]]
 
+# the hint words are plain ASCII, so they can be matched on the raw bytes
+_DIALOGUE_HINT_RE = re.compile(rb"Evenin|Any t|Nothing|\?")
+# printable ASCII stays, every other byte shows as '.'
+_PRINTABLE_TABLE = bytes(i if 32 <= i <= 126 else ord('.') for i in range(256))
+
 def scan_for_text(addr, data):
-    text = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in data)
-    if any(word in text for word in ["Evenin", "Any t", "Nothing", "?"]):
+    if _DIALOGUE_HINT_RE.search(data):
+        text = data.translate(_PRINTABLE_TABLE).decode('latin-1')
         print(f"\n🔎 Possible dialogue at 0x{addr:08X}:")
         print(text)
 
@@ -43,9 +61,8 @@ def main():
     print(f"\n✅ Found {len(changed)} changed memory blocks.")
 
     for addr in changed[:100]:  # first 100 only
-        data = read_memory(addr, CHUNK_SIZE)
-        if data:
-            scan_for_text(addr, data)
+        # the second snapshot already holds these bytes; no need to read them again
+        scan_for_text(addr, after[addr])
 
 if __name__ == "__main__":
     main()
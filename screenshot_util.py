@@ -1,25 +1,53 @@
 # screenshot_util.py
 
 import pyautogui
+import threading
 import time
 import win32gui
 import win32con
-from PIL import ImageGrab
+from PIL import Image, ImageGrab
+
+# mss grabs straight into a reusable buffer and is faster than ImageGrab;
+# optional (pip install mss), ImageGrab is the fallback
+try:
+    import mss
+except ImportError:
+    mss = None
+
+# mss handles hold per-thread GDI state, so each thread gets its own
+_mss_local = threading.local()
 
 # Change this to match your Dolphin window name more loosely if needed
 WINDOW_KEYWORDS = ["Dolphin", "Animal Crossing"]
 
+# last window found; re-checked with one IsWindow/GetWindowText call per use
+_HWND_CACHE = None
+
+class _WindowFound(Exception):
+    """Raised from the EnumWindows callback to stop enumerating early."""
+
+def _is_dolphin_title(title):
+    return all(key.lower() in title.lower() for key in WINDOW_KEYWORDS)
+
 def find_dolphin_window():
     """Find the Dolphin window handle based on title keywords."""
+    global _HWND_CACHE
+    if _HWND_CACHE and win32gui.IsWindow(_HWND_CACHE) and _is_dolphin_title(win32gui.GetWindowText(_HWND_CACHE)):
+        return _HWND_CACHE
+
     target_hwnd = None
 
     def enum_handler(hwnd, _):
         nonlocal target_hwnd
-        title = win32gui.GetWindowText(hwnd)
-        if all(key.lower() in title.lower() for key in WINDOW_KEYWORDS):
+        if _is_dolphin_title(win32gui.GetWindowText(hwnd)):
             target_hwnd = hwnd
+            raise _WindowFound
 
-    win32gui.EnumWindows(enum_handler, None)
+    try:
+        win32gui.EnumWindows(enum_handler, None)
+    except _WindowFound:
+        pass
+    _HWND_CACHE = target_hwnd
     return target_hwnd
 
 def activate_window(hwnd):
@@ -43,6 +71,12 @@ def screenshot_dolphin_window():
     left, top, right, bottom = win32gui.GetWindowRect(hwnd)
 
     # Capture only this region
+    if mss is not None:
+        sct = getattr(_mss_local, "sct", None)
+        if sct is None:
+            sct = _mss_local.sct = mss.mss()
+        raw = sct.grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        return Image.frombytes("RGB", raw.size, raw.rgb)
     img = ImageGrab.grab(bbox=(left, top, right, bottom))
     return img
 
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+import dialogue_cache
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(dialogue_cache.time, "time", fake)
+    return fake
+
+
+def _rows(path):
+    with sqlite3.connect(str(path)) as conn:
+        return {key for (key,) in conn.execute("SELECT key FROM answers")}
+
+
+def test_store_then_lookup_hits(tmp_path, clock):
+    cache = dialogue_cache.AnswerCache(path=str(tmp_path / "cache.sqlite3"))
+    key = dialogue_cache.make_key("m", 0.7, 100, [{"role": "user", "content": "hi"}])
+
+    assert cache.lookup(key) is None
+    cache.store(key, "Hello there!")
+    assert cache.lookup(key) == "Hello there!"
+
+
+def test_expired_entry_misses_and_is_deleted(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    cache = dialogue_cache.AnswerCache(path=str(path), ttl=60)
+    cache.store("k", "stale")
+
+    clock.now += 61
+    assert cache.lookup("k") is None
+    assert _rows(path) == set()
+
+
+def test_eviction_keeps_most_recently_used(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    cache = dialogue_cache.AnswerCache(path=str(path), max_entries=2)
+    cache.store("a", "A")
+    clock.now += 1
+    cache.store("b", "B")
+    clock.now += 1
+    assert cache.lookup("a") == "A"  # "a" is now more recent than "b"
+    clock.now += 1
+    cache.store("c", "C")
+
+    assert _rows(path) == {"a", "c"}
+
+
+def test_stats_counts_hits_and_misses(tmp_path, clock):
+    cache = dialogue_cache.AnswerCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.store("k", "v")
+    cache.lookup("k")
+    cache.lookup("k")
+    cache.lookup("missing")
+
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "entries": 1}
+
+
+def test_module_stats_does_not_create_database_when_disabled(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite3"
+    monkeypatch.setattr(dialogue_cache, "ENABLED", False)
+    monkeypatch.setattr(dialogue_cache, "_DEFAULT_CACHE", dialogue_cache.AnswerCache(path=str(path)))
+
+    assert dialogue_cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+    assert not path.exists()
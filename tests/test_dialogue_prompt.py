@@ -0,0 +1,108 @@
+import io
+import json
+
+import pytest
+import requests
+
+import dialogue_prompt
+
+
+def _sse_response(events, status_code=200, content_type="text/event-stream"):
+    body = b"".join(line.encode("utf-8") + b"\n" for line in events)
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers["Content-Type"] = content_type
+    response.raw = io.BytesIO(body)
+    return response
+
+
+class _StubSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+def _delta(text):
+    return "data: " + json.dumps({"choices": [{"delta": {"content": text}}]}, ensure_ascii=False)
+
+
+@pytest.fixture
+def stub_session(monkeypatch):
+    def install(response):
+        session = _StubSession(response)
+        monkeypatch.setattr(dialogue_prompt, "_SESSION", session)
+        return session
+    return install
+
+
+@pytest.mark.parametrize("content_type", ["text/event-stream", "application/octet-stream"])
+def test_post_to_openrouter_decodes_streamed_utf8(stub_session, content_type):
+    session = stub_session(_sse_response([
+        ": OPENROUTER PROCESSING",
+        "",
+        _delta("It’s café "),
+        ": keep-alive",
+        _delta("time ♥"),
+        "data: [DONE]",
+        _delta(" ignored"),
+    ], content_type=content_type))
+
+    text = dialogue_prompt._post_to_openrouter([{"role": "user", "content": "hi"}], 50)
+
+    assert text == "It’s café time ♥"
+    assert session.calls[0][1]["json"]["stream"] is True
+
+
+def test_post_to_openrouter_raises_on_stream_error_event(stub_session):
+    stub_session(_sse_response([
+        _delta("partial"),
+        'data: {"error": {"message": "upstream overloaded"}}',
+    ]))
+
+    with pytest.raises(RuntimeError, match="upstream overloaded"):
+        dialogue_prompt._post_to_openrouter([{"role": "user", "content": "hi"}], 50)
+
+
+@pytest.fixture
+def openrouter(monkeypatch, stub_session):
+    monkeypatch.setattr(dialogue_prompt, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(dialogue_prompt.dialogue_cache, "ENABLED", False)
+    return lambda: stub_session(_sse_response([_delta("Hi!"), "data: [DONE]"]))
+
+
+def test_static_system_prompt_leads_every_payload(openrouter, monkeypatch):
+    monkeypatch.setattr(dialogue_prompt, "MODEL", "openai/gpt-4o-mini")
+    sent = []
+    for villager in ("Ace", "Admiral"):
+        session = openrouter()
+        dialogue_prompt.generate_dialogue(villager)
+        sent.append(session.calls[0][1]["json"]["messages"])
+
+    for villager, messages in zip(("Ace", "Admiral"), sent):
+        assert messages[0] == {"role": "system", "content": dialogue_prompt._STATIC_SYSTEM_PROMPT}
+        assert f"Villager persona: {villager}" in messages[1]["content"]
+    assert json.dumps(sent[0][0]) == json.dumps(sent[1][0])
+
+
+@pytest.mark.parametrize("model, marked", [
+    ("anthropic/claude-3.5-haiku", True),
+    ("openai/gpt-4o-mini", False),
+])
+def test_cache_control_only_for_anthropic_models(openrouter, monkeypatch, model, marked):
+    monkeypatch.setattr(dialogue_prompt, "MODEL", model)
+    session = openrouter()
+
+    dialogue_prompt.generate_dialogue("Ace")
+
+    messages = session.calls[0][1]["json"]["messages"]
+    assert ("cache_control" in json.dumps(messages)) is marked
+    if marked:
+        assert messages[0]["content"] == [{
+            "type": "text",
+            "text": dialogue_prompt._STATIC_SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }]
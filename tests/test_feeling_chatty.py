@@ -43,6 +43,19 @@ def test_injected_choice_round_trips_through_encoder():
     assert "<Choice 1 Jump [1234]>" in round_tripped
 
 
+def test_encode_canonical_text_matches_parse():
+    sample = (
+        "<Open Choice Menu>"
+        " Option A<Choice 1 Jump [1234]>"
+        "<Choice 2 Jump [5678]>"
+    )
+    modified = ac_parser_encoder._inject_feeling_chatty_option(sample)
+    encoded, canonical = ac_parser_encoder.encode_ac_text(modified, return_canonical=True)
+
+    assert encoded == ac_parser_encoder.encode_ac_text(modified)
+    assert canonical == ac_parser_encoder.parse_ac_text(encoded)
+
+
 def test_conversation_state_allows_menu_after_single_line():
     state = ac_parser_encoder.ConversationState()
 
@@ -0,0 +1,80 @@
+import queue
+import sys
+import threading
+import types
+
+# Provide a stub so importing ac_parser_encoder during tests does not require GUI deps.
+screenshot_stub = types.ModuleType("screenshot_util")
+screenshot_stub.screenshot_dolphin_window = lambda: None
+sys.modules.setdefault("screenshot_util", screenshot_stub)
+
+import pytest
+
+import ac_parser_encoder
+
+
+class _FakeMemory:
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.writes = []
+        self.connects = 0
+
+    def write_memory(self, addr, data):
+        if self.connected:
+            self.writes.append((addr, data))
+        return self.connected
+
+    def connect(self):
+        self.connects += 1
+        return True
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    memory = _FakeMemory()
+    monkeypatch.setattr(ac_parser_encoder.memory_ipc, "write_memory", memory.write_memory)
+    monkeypatch.setattr(ac_parser_encoder.memory_ipc, "connect", memory.connect)
+    gen_queue = queue.Queue()
+    done_queue = queue.Queue()
+    threading.Thread(
+        target=ac_parser_encoder._generation_worker,
+        args=(gen_queue, done_queue, False),
+        daemon=True,
+    ).start()
+
+    def run(job):
+        gen_queue.put(job)
+        return done_queue.get(timeout=2)
+    return memory, run
+
+
+def test_worker_writes_generated_dialogue(worker, monkeypatch):
+    memory, run = worker
+    monkeypatch.setattr(ac_parser_encoder, "generate_dialogue", lambda name, **kwargs: f"Hi from {name}!")
+
+    addr, predicted, written_at, lost_connection = run((0x1000, "Hello.", "Bones", None))
+
+    assert (addr, predicted, lost_connection) == (0x1000, "Hi from Bones!", False)
+    assert written_at > 0
+    assert memory.writes[-1] == (0x1000, ac_parser_encoder.encode_ac_text("Hi from Bones!"))
+
+
+def test_worker_reports_and_survives_system_exit(worker, monkeypatch):
+    _, run = worker
+
+    def exiting_generator(name, **kwargs):
+        sys.exit(1)
+    monkeypatch.setattr(ac_parser_encoder, "generate_dialogue", exiting_generator)
+    assert run((0x1000, "Hello.", "Bones", None)) == (0x1000, None, 0.0, False)
+
+    monkeypatch.setattr(ac_parser_encoder, "generate_dialogue", lambda name, **kwargs: "Back again.")
+    assert run((0x1000, "Hello.", "Bones", None))[1] == "Back again."
+
+
+def test_worker_leaves_reconnecting_to_the_poll_loop(worker, monkeypatch):
+    memory, run = worker
+    memory.connected = False
+    monkeypatch.setattr(ac_parser_encoder, "generate_dialogue", lambda name, **kwargs: "unused")
+
+    assert run((0x1000, "Hello.", "Bones", None)) == (0x1000, None, 0.0, True)
+    assert memory.connects == 0
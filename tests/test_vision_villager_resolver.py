@@ -0,0 +1,66 @@
+import difflib
+import sys
+import types
+
+from PIL import Image
+
+# Stubs so importing the resolver does not require the GUI / OpenAI deps.
+screenshot_stub = types.ModuleType("screenshot_util")
+screenshot_stub.screenshot_dolphin_window = lambda: None
+sys.modules.setdefault("screenshot_util", screenshot_stub)
+openai_stub = types.ModuleType("openai")
+openai_stub.OpenAI = object
+sys.modules.setdefault("openai", openai_stub)
+
+import pytest
+
+import vision_villager_resolver as resolver
+
+
+def _ratio(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio() * 100
+
+
+def _extract_one(query, choices, scorer):
+    best = max(choices, key=lambda choice: scorer(query, choice))
+    return best, scorer(query, best), choices.index(best)
+
+
+class _VisionClient:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+        self.responses = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return types.SimpleNamespace(output_text=self.reply)
+
+
+@pytest.fixture
+def ocr(monkeypatch):
+    monkeypatch.setattr(resolver, "fuzz", types.SimpleNamespace(ratio=_ratio), raising=False)
+    monkeypatch.setattr(resolver, "process", types.SimpleNamespace(extractOne=_extract_one), raising=False)
+    monkeypatch.setattr(resolver, "_villager_names", lambda: ("Ed", "Bones", "Goldie"))
+    monkeypatch.setattr(resolver, "screenshot_dolphin_window", lambda: Image.new("RGB", (640, 480)))
+    vision = _VisionClient('{"name": "Tabby", "text": "Hi!"}')
+    monkeypatch.setattr(resolver, "_client", vision)
+
+    def install(text):
+        monkeypatch.setattr(resolver, "pytesseract", types.SimpleNamespace(image_to_string=lambda img: text))
+        return vision
+    return install
+
+
+def test_name_tag_line_is_matched_locally(ocr):
+    vision = ocr("Goldie\nEducation is important, you know!")
+
+    assert resolver.identify_from_screenshot() == {"name": "Goldie"}
+    assert vision.calls == 0
+
+
+def test_short_name_inside_dialogue_falls_through_to_vision(ocr):
+    vision = ocr("Tabby\nEducation is important, you know!")
+
+    assert resolver.identify_from_screenshot() == {"name": "Tabby", "text": "Hi!"}
+    assert vision.calls == 1
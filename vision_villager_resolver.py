@@ -1,14 +1,43 @@
 import os
+import io
 import json
-import openai
-from screenshot_util import capture_dolphin_screenshot
+import base64
+import functools
+from openai import OpenAI
+from screenshot_util import screenshot_dolphin_window
 
-# Make sure OpenAI key is loaded from .env
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# optional local OCR pre-filter (pip install pytesseract rapidfuzz); without
+# them every lookup goes straight to the vision model
+try:
+    import pytesseract
+    from rapidfuzz import fuzz, process
+except ImportError:
+    pytesseract = None
 
 # Path to villagers.json (adjust if needed)
 VILLAGER_JSON_PATH = "villagers.json"
 
+# minimum rapidfuzz ratio for an OCR'd name tag to count as a match
+OCR_MATCH_THRESHOLD = 85
+
+_client = None
+
+def _get_client() -> OpenAI:
+    """Shared client, so repeat lookups reuse one HTTP connection pool."""
+    global _client
+    if _client is None:
+        # Make sure OpenAI key is loaded from .env
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+@functools.lru_cache(maxsize=1)
+def _villager_names() -> tuple:
+    try:
+        with open(VILLAGER_JSON_PATH, "r", encoding="utf-8") as f:
+            return tuple(json.load(f))
+    except Exception:
+        return ()
+
 def clean_villager_name(raw_name: str) -> str:
     """Cleans OCR / Vision output so it becomes a valid villager name."""
     if not raw_name:
@@ -28,30 +57,63 @@ def clean_villager_name(raw_name: str) -> str:
     # If it's a 1-word lowercase name like "bones"
     return name.capitalize()
 
+def _match_name_tag(img):
+    """Local OCR of the dialogue box (bottom third); its name tag matched against known villagers."""
+    if pytesseract is None:
+        return None
+    names = _villager_names()
+    if not names:
+        return None
+    try:
+        w, h = img.size
+        txt = pytesseract.image_to_string(img.crop((0, h * 2 // 3, w, h)))
+    except Exception:
+        return None
+    # the name tag is the first line; scoring the whole box would let short
+    # names ("Ed") match inside the dialogue body ("Education ...")
+    lines = [line.strip(" .,!:|") for line in txt.splitlines()]
+    tag = next((line for line in lines if line), "")
+    if not tag:
+        return None
+    match = process.extractOne(tag, names, scorer=fuzz.ratio)
+    if match and match[1] >= OCR_MATCH_THRESHOLD:
+        return match[0]
+    return None
+
+def _image_to_data_url(img) -> str:
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, "JPEG", quality=85)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
 def identify_from_screenshot() -> dict:
     """
-    Takes a screenshot of Dolphin window, sends to GPT-4 Vision,
-    returns villager name + dialogue text (if possible).
+    Takes a screenshot of Dolphin window and reads the villager's name tag
+    locally when OCR is available; otherwise (or if that fails) asks the
+    vision model. Returns villager name + dialogue text (if possible).
     """
-    screenshot_path = capture_dolphin_screenshot()
-    if not screenshot_path:
+    img = screenshot_dolphin_window()
+    if img is None:
         return {"error": "no_screenshot"}
 
+    name = _match_name_tag(img)
+    if name:
+        return {"name": name}
+
     try:
-        response = openai.ChatCompletion.create(
+        response = _get_client().responses.create(
             model="gpt-4o-mini",
-            messages=[
+            input=[
                 {"role": "system", "content": "You are an expert at reading Animal Crossing screenshots and recognizing characters."},
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": "What is the villager's name and what are they saying? Reply in JSON with keys 'name' and 'text'."},
-                        {"type": "image_url", "image_url": f"file://{os.path.abspath(screenshot_path)}"}
+                        {"type": "input_text", "text": "What is the villager's name and what are they saying? Reply in JSON with keys 'name' and 'text'."},
+                        {"type": "input_image", "image_url": _image_to_data_url(img)}
                     ]
                 }
             ]
         )
-        reply = response.choices[0].message.content
+        reply = response.output_text
         # Expecting something like: {"name": "Bones", "text": "Hey, how are you yip yip?"}
         data = json.loads(reply)
         return data